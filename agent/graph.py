@@ -1,118 +1,227 @@
 from __future__ import annotations
 
-from typing import TypedDict, Dict, Any
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional
+import orjson
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import SystemMessage, HumanMessage
-from pydantic import TypeAdapter
 
 from agent.schemas import PoemRequest, Critique
-from core.safe_call import safe_invoke
+from core.prompt_loader import CompiledTemplate, compile_template, render_template
+from core.safe_call import safe_ainvoke
 
 
-class AgentState(TypedDict, total=False):
+@dataclass(slots=True)
+class AgentState:
+    """Graph state; nodes read attributes and return dicts of updated fields."""
+
     request: PoemRequest
-    poem: str
-    critique: Critique
-    revised_poem: str
-    user_memory: str
+    # request.model_dump(), taken once per run; every node reads this instead
+    request_dump: Optional[Dict[str, Any]] = None
+    poem: Optional[str] = None
+    critique: Optional[Critique] = None
+    critique_dump: Optional[Dict[str, Any]] = None
+    revised_poem: Optional[str] = None
+    # >1 asks the reviser for that many alternatives in a single request
+    n_candidates: int = 1
+    revised_candidates: Optional[List[str]] = None
+    user_memory: Optional[str] = None
+
+
+def _request_dump(state: AgentState) -> Dict[str, Any]:
+    if state.request_dump is None:
+        return state.request.model_dump()
+    return state.request_dump
 
 
 def _ctx(state: AgentState) -> Dict[str, Any]:
     """Build formatting context for YAML templates."""
-    req = state["request"]
-    data = req.model_dump()
-    data["user_memory"] = state.get("user_memory") or "None"
+    data = dict(_request_dump(state))
+    data["user_memory"] = state.user_memory or "None"
     return data
 
 
+def _find_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text, or None.
+    Single pass with a depth counter; braces inside JSON strings are ignored.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def _maybe_strip(text: str) -> str:
+    """str.strip() without the copy when there is nothing to trim (the usual case)."""
+    if text and not (text[0].isspace() or text[-1].isspace()):
+        return text
+    return text.strip()
+
+
+def _is_static(segments: CompiledTemplate) -> bool:
+    """True when a compiled template has no {placeholders} to fill."""
+    return all(field is None for _, field in segments)
+
+
+def _parse_critique(content: str) -> Dict[str, Any]:
+    raw = _maybe_strip(content or "")
+
+    # JSON mode replies are a bare object; only scan when the model added prose.
+    if not (raw.startswith("{") and raw.endswith("}")):
+        obj = _find_json_object(raw)
+        if obj is None:
+            raise RuntimeError(f"critic_parse_failed: {raw[:200]}")
+        raw = obj
+
+    critique = Critique.model_validate_json(raw)
+    return {"critique": critique, "critique_dump": critique.model_dump()}
+
+
+def _json(obj: Any) -> str:
+    """
+    Compact JSON for prompt bodies (dict reprs cost more tokens and aren't JSON).
+    Keys are sorted so equal inputs always produce byte-identical prompts.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+
+
+def _critic_ctx(state: AgentState) -> Dict[str, Any]:
+    constraints = state.request.constraints_for_critique(_request_dump(state))
+    return {"constraints": _json(constraints), "poem": state.poem}
+
+
+def _reviser_ctx(state: AgentState) -> Dict[str, Any]:
+    ctx = _ctx(state)
+    ctx["poem"] = state.poem
+    ctx["critique"] = _json(state.critique_dump or state.critique.model_dump())
+    return ctx
+
+
 def build_graphs(llm, prompts: Dict[str, Dict[str, str]], logger):
-    def generate_poem(state: AgentState):
-        ctx = _ctx(state)
-        tpl = prompts["generator"]
-
-        system_prompt = tpl["system"].format(**ctx)
-        user_prompt = tpl["user"].format(**ctx)
-
-        msg = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt),
-        ]
-
-        res = safe_invoke(
-            logger,
-            user_error="Could not generate a poem right now.",
-            fn=lambda: llm.invoke(msg),
-        )
-        if not res.ok:
-            raise RuntimeError(res.error_debug or "generate_failed")
-
-        return {"poem": res.content.strip()}
-
-    def criticize_poem(state: AgentState):
-        req = state["request"]
-        schema_str = Critique.model_json_schema()
-
-        tpl = prompts["critic"]
-        system_prompt = tpl["system"].format(schema=schema_str)
-        user_prompt = tpl["user"].format(
-            constraints=req.model_dump(),
-            poem=state["poem"],
-        )
-
-        msg = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt),
-        ]
-
-        res = safe_invoke(
-            logger,
-            user_error="Could not critique the poem right now.",
-            fn=lambda: llm.invoke(msg),
-        )
-        if not res.ok:
-            raise RuntimeError(res.error_debug or "critic_failed")
-
-        raw = (res.content or "").strip()
-
-        # strict parse first
-        try:
-            critique = TypeAdapter(Critique).validate_json(raw)
-            return {"critique": critique}
-        except Exception:
-            # fallback: extract JSON object if model added extra text
-            import re
-
-            m = re.search(r"\{.*\}", raw, flags=re.DOTALL)
-            if not m:
-                raise RuntimeError(f"critic_parse_failed: {raw[:200]}")
-            critique = TypeAdapter(Critique).validate_json(m.group(0))
-            return {"critique": critique}
-
-    def revise_poem(state: AgentState):
-        ctx = _ctx(state)
-        tpl = prompts["reviser"]
-
-        system_prompt = tpl["system"].format(**ctx)
-        user_prompt = tpl["user"].format(
-            **ctx,
-            poem=state["poem"],
-            critique=state["critique"].model_dump(),
-        )
-
-        msg = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt),
-        ]
-
-        res = safe_invoke(
-            logger,
-            user_error="Could not revise the poem right now.",
-            fn=lambda: llm.invoke(msg),
-        )
-        if not res.ok:
-            raise RuntimeError(res.error_debug or "revise_failed")
-
-        return {"revised_poem": res.content.strip()}
+    """
+    Compile the full, improve-only and draft-only graphs (in that order).
+    Prompts are rendered/parsed here, so they must not be mutated after the build.
+    """
+    # Templates are parsed once per build; nodes only join pre-split segments.
+    tpl = {
+        name: {part: compile_template(text) for part, text in block.items()}
+        for name, block in prompts.items()
+    }
+
+    # System prompts that don't reference request fields are rendered once here,
+    # so every call sends a byte-identical leading prefix (provider prompt caching
+    # keys on the longest stable prefix). Dynamic content stays in the user turn.
+    static_system = {
+        name: render_template(tpl[name]["system"], {})
+        for name in ("generator", "reviser")
+        if _is_static(tpl[name]["system"])
+    }
+    static_system["critic"] = render_template(
+        tpl["critic"]["system"], {"schema": _json(Critique.model_json_schema())}
+    )
+
+    # Critic replies must be a JSON object; ask the provider to enforce it.
+    critic_llm = llm.bind(response_format={"type": "json_object"})
+
+    def make_llm_node(
+        name: str,
+        *,
+        model,
+        user_error: str,
+        fail_code: str,
+        build_ctx: Callable[[AgentState], Dict[str, Any]],
+        post: Callable[[str], Dict[str, Any]],
+        candidates_key: Optional[str] = None,
+    ):
+        """
+        One system+user LLM call: render prompts, invoke safely, map the reply.
+        With candidates_key set, state.n_candidates > 1 samples that many replies
+        in one request; post() maps the first, all of them go under candidates_key.
+        """
+        # Static system prompts get one shared message object for the graph's life;
+        # only the HumanMessage is allocated per call.
+        system_static = static_system.get(name)
+        system_msg = SystemMessage(content=system_static) if system_static else None
+        system_tpl = tpl[name]["system"]
+        user_tpl = tpl[name]["user"]
+
+        async def node(state: AgentState):
+            ctx = build_ctx(state)
+
+            msg = [
+                system_msg or SystemMessage(content=render_template(system_tpl, ctx)),
+                HumanMessage(content=render_template(user_tpl, ctx)),
+            ]
+
+            n = state.n_candidates if candidates_key else 1
+            if n > 1:
+                # One request with n choices: the prompt is prefilled once.
+                res = await safe_ainvoke(
+                    logger, model.agenerate, [msg], user_error=user_error, n=n
+                )
+                if not res.ok:
+                    raise RuntimeError(res.error_debug or fail_code)
+
+                texts = [g.text for g in res.value.generations[0]]
+                update = post(texts[0])
+                update[candidates_key] = [_maybe_strip(t) for t in texts]
+                return update
+
+            res = await safe_ainvoke(logger, model.ainvoke, msg, user_error=user_error)
+            if not res.ok:
+                raise RuntimeError(res.error_debug or fail_code)
+
+            return post(res.content)
+
+        return node
+
+    generate_poem = make_llm_node(
+        "generator",
+        model=llm,
+        user_error="Could not generate a poem right now.",
+        fail_code="generate_failed",
+        build_ctx=_ctx,
+        post=lambda text: {"poem": _maybe_strip(text)},
+    )
+    criticize_poem = make_llm_node(
+        "critic",
+        model=critic_llm,
+        user_error="Could not critique the poem right now.",
+        fail_code="critic_failed",
+        build_ctx=_critic_ctx,
+        post=_parse_critique,
+    )
+    revise_poem = make_llm_node(
+        "reviser",
+        model=llm,
+        user_error="Could not revise the poem right now.",
+        fail_code="revise_failed",
+        build_ctx=_reviser_ctx,
+        post=lambda text: {"revised_poem": _maybe_strip(text)},
+        candidates_key="revised_candidates",
+    )
 
     # Full graph: generate -> critique -> revise
     full = StateGraph(AgentState)
@@ -134,4 +243,11 @@ def build_graphs(llm, prompts: Dict[str, Dict[str, str]], logger):
     improve.add_edge("revise_poem", END)
     improve_graph = improve.compile()
 
-    return full_graph, improve_graph
+    # Draft-only graph: generate. "Generate only" needs one round-trip, not three.
+    draft = StateGraph(AgentState)
+    draft.add_node("generate_poem", generate_poem)
+    draft.set_entry_point("generate_poem")
+    draft.add_edge("generate_poem", END)
+    draft_graph = draft.compile()
+
+    return full_graph, improve_graph, draft_graph
@@ -1,6 +1,6 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional, Literal
 
 PoemStyle = Literal[
     "free_verse",
@@ -16,6 +16,8 @@ ReadingLevel = Literal["simple", "general", "advanced"]
 
 
 class PoemRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     occasion: str = "just for fun"
     theme: str
     audience: Optional[str] = None
@@ -35,6 +37,17 @@ class PoemRequest(BaseModel):
 
     acrostic_word: Optional[str] = None
 
+    def constraints_for_critique(
+        self, dump: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fields the critic checks, minus unset ones (None / empty lists).
+        Defaulted values (line_count, rhyme, ...) stay: they are still constraints.
+        Pass an existing model_dump() to avoid dumping again.
+        """
+        data = self.model_dump() if dump is None else dump
+        return {k: v for k, v in data.items() if v is not None and v != []}
+
 
 class Critique(BaseModel):
     constraint_issues: List[str] = Field(default_factory=list)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import copy
+import functools
+import itertools
+import re
 import uuid
+from collections import deque
+
+import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
 from core.config import load_config
 from core.logging_setup import setup_logger
-from core.llm_factory import create_llm
-from core.orchestrator import generate_only, generate_and_improve, improve_again
 from agent.schemas import PoemRequest
 from core.storage import get_storage
 
@@ -18,17 +23,31 @@ st.set_page_config(page_title="The Weight of Words", page_icon="📜", layout="w
 st.title("The Weight of Words")
 st.caption("Beautiful poem generator")
 
+
+# Config and storage are process-wide: parsed / schema-checked once per server
+# process, not on every rerun. A failure isn't cached, so the next rerun retries.
+@st.cache_resource(show_spinner=False)
+def get_config():
+    return load_config()
+
+
+@st.cache_resource(show_spinner=False)
+def get_ready_storage():
+    s = get_storage()
+    s.init()
+    return s
+
+
 # ---- Config validation ----
 try:
-    cfg = load_config()
+    cfg = get_config()
 except Exception as e:
     st.error(str(e))
     st.stop()
 
 # ---- Storage init (cloud-ready) ----
-storage = get_storage()
 try:
-    storage.init()
+    storage = get_ready_storage()
 except Exception as e:
     st.error(f"Storage init failed: {e}")
     st.stop()
@@ -53,62 +72,167 @@ WRITER_STYLES = {
     "Matsuo Bashō": "minimalist stillness, nature clarity (no imitation or copying)",
     "Alexander Pushkin": "lyrical clarity, narrative elegance (no imitation or copying)",
 }
+WRITER_STYLE_NAMES = tuple(WRITER_STYLES)
+
+# ---- Selectbox options (built once; index maps replace list.index per rerun) ----
+READING_LEVELS = ("simple", "general", "advanced")
+READING_LEVEL_IDX = {v: i for i, v in enumerate(READING_LEVELS)}
+
+MODELS = ("gpt-4o-mini", "gpt-4.1-mini", "gpt-4o")
+MODEL_IDX = {v: i for i, v in enumerate(MODELS)}
+
+TONES = (
+    "warm",
+    "funny",
+    "romantic",
+    "somber",
+    "hopeful",
+    "angry",
+    "motivational",
+    "surreal",
+    "minimalist",
+)
+TONE_IDX = {v: i for i, v in enumerate(TONES)}
+
+OCCASIONS = (
+    "for inspiration",
+    "apology",
+    "birthday",
+    "anniversary",
+    "wedding",
+    "graduation",
+    "goodbye",
+    "valentine",
+)
+FORMATS = (
+    "free_verse",
+    "haiku",
+    "limerick",
+    "acrostic",
+    "sonnet_like",
+    "spoken_word",
+    "rhymed_couplets",
+)
+
+# Versions kept per session; older ones drop off the front of the deque.
+MAX_VERSIONS = 20
 
 # ---- Session state ----
-for k in [
-    "last_request",
-    "last_poem",
-    "last_critique",
-    "last_revised",
-    "versions",
-    "poem_name",
-    "rated_versions",
-]:
-    st.session_state.setdefault(k, None)
-
-if st.session_state["versions"] is None:
-    st.session_state["versions"] = []
-
-if st.session_state["rated_versions"] is None:
-    st.session_state["rated_versions"] = set()
-
-# Advanced defaults
-st.session_state.setdefault("adv_model", "gpt-4o-mini")
-st.session_state.setdefault("adv_temperature", 0.9)
-st.session_state.setdefault("adv_top_p", 0.95)
-
-st.session_state.setdefault("adv_audience", "")
-
-# Move these to advanced top
-st.session_state.setdefault("adv_apply_prefs", True)
-st.session_state.setdefault("adv_use_people", True)
-st.session_state.setdefault("adv_show_injected_memory", False)
-
-st.session_state.setdefault("adv_rhyme", False)
-st.session_state.setdefault("adv_no_cliches", True)
-st.session_state.setdefault("adv_reading_level", "general")
-
-st.session_state.setdefault("adv_must_include", "")
-st.session_state.setdefault("adv_avoid", "")
-st.session_state.setdefault("adv_syllable_hints", "")
-
-st.session_state.setdefault("adv_tone", "warm")
-st.session_state.setdefault("adv_show_debug", False)
+# Built once at import. Mutable defaults are copied per session in the init below.
+_SESSION_DEFAULTS = {
+    "last_request": None,
+    # last_request.model_dump(), taken once at generate time for rating submits
+    "last_request_dump": None,
+    "last_poem": None,
+    "last_critique": None,
+    "last_revised": None,
+    "versions": deque(maxlen=MAX_VERSIONS),
+    # versions ever added since the last Generate; numbers the labels
+    "version_count": 0,
+    "poem_name": None,
+    # bit i set = versions[i] has been rated
+    "rated_versions": 0,
+    # Advanced defaults
+    "adv_model": "gpt-4o-mini",
+    "adv_temperature": 0.9,
+    "adv_top_p": 0.95,
+    "adv_audience": "",
+    # Move these to advanced top
+    "adv_apply_prefs": True,
+    "adv_use_people": True,
+    "adv_show_injected_memory": False,
+    "adv_rhyme": False,
+    "adv_no_cliches": True,
+    "adv_reading_level": "general",
+    "adv_must_include": "",
+    "adv_avoid": "",
+    "adv_syllable_hints": "",
+    "adv_tone": "warm",
+    "adv_show_debug": False,
+    "adv_reuse_results": False,
+}
+
+# Seed any missing key on every run, so defaults added while a session is live
+# still appear. Copies keep mutable defaults (the deque) out of shared state.
+for k, v in _SESSION_DEFAULTS.items():
+    if k not in st.session_state:
+        st.session_state[k] = copy.copy(v)
 
 STAR_OPTIONS = [1, 2, 3, 4, 5]
 
+# "Improve again" samples this many revisions in one request; the first becomes
+# the next version and the rest are shown as alternatives of the same base.
+IMPROVE_CANDIDATES = 3
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def poem_bytes(text: str) -> bytes:
+    # Stable UTF-8 payload per poem text for download buttons; unchanged versions
+    # reuse the same bytes (and media file id) across reruns.
+    return text.encode("utf-8")
+
+
+@functools.lru_cache(maxsize=64)
+def split_csv(text: str) -> tuple[str, ...]:
+    # Comma-separated Advanced inputs; the same strings are split once.
+    return tuple(w.strip() for w in text.split(",") if w.strip())
+
+
+def longest_backtick_run(text: str) -> int:
+    return max((len(m) for m in re.findall(r"`+", text)), default=0)
+
+
+def make_version(label: str, text: str, alternative: bool = False) -> dict:
+    # The rating form key is derived once here rather than on every rerun.
+    form_key = f"rate_{label}".replace(" ", "_").replace("(", "").replace(")", "")
+    return {
+        "label": label,
+        "text": text,
+        "form_key": form_key,
+        "alternative": alternative,
+    }
+
+
+_STAR_LABELS = tuple("⭐" * n + "☆" * (5 - n) for n in range(6))
+
 
 def stars_label(n: int) -> str:
-    return "⭐" * n + "☆" * (5 - n)
+    return _STAR_LABELS[n]
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_user_bundle(_storage_obj, user_id: str, revision: int) -> dict:
+    # Taste profile, people and recent ratings in one storage round-trip, cached
+    # until the user's storage revision changes.
+    return _storage_obj.get_user_bundle(user_id, ratings_limit=10)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def ratings_df(_storage_obj, user_id: str, revision: int) -> pd.DataFrame:
+    # Typed frame of the recent ratings, built once per storage revision;
+    # int8/category columns keep the Arrow payload sent to the browser small.
+    rows = load_user_bundle(_storage_obj, user_id, revision)["recent_ratings"]
+    return pd.DataFrame(rows).astype(
+        {"rating": "int8", "poem_name": "category", "version_label": "category"}
+    )
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
 def build_user_memory(
-    storage_obj, user_id: str, include_prefs: bool, include_people: bool
+    _storage_obj,
+    user_id: str,
+    include_prefs: bool,
+    include_people: bool,
+    revision: int,
 ) -> str:
+    # Cached per (user, toggles, storage revision): reruns from typing skip the
+    # DB reads, and any write for the user bumps the revision. The leading
+    # underscore keeps the storage object out of the cache key.
+    bundle = load_user_bundle(_storage_obj, user_id, revision)
     parts = []
 
     if include_prefs:
-        taste = storage_obj.get_taste_profile(user_id) or {}
+        taste = bundle["taste"] or {}
         total = int(taste.get("total_ratings", 0) or 0)
 
         if total <= 0:
@@ -140,44 +264,73 @@ def build_user_memory(
             )
 
     if include_people:
-        ppl = storage_obj.list_people(user_id) or []
+        ppl = bundle["people"] or []
         if not ppl:
             parts.append("People memory: none yet.")
         else:
-            lines = []
-            for p in ppl[:10]:
-                note = f" — note: {p['note']}" if p.get("note") else ""
-                lines.append(f"- {p['name']} ({p['relationship']}){note}")
-            parts.append("People memory:\n" + "\n".join(lines))
+            # str.join builds a list from a generator anyway; hand it one directly.
+            people_lines = [
+                f"- {p['name']} ({p['relationship']})"
+                + (f" — note: {p['note']}" if p.get("note") else "")
+                for p in itertools.islice(ppl, 10)
+            ]
+            parts.append("People memory:\n" + "\n".join(people_lines))
 
     return "\n\n".join(parts).strip() or "None"
 
 
+# Relationship keyword -> (priority, icon). When several keywords appear, the
+# lowest priority wins (e.g. "friend and boss" -> friend), as in the old if-chain.
+_REL_ICON = {
+    "girlfriend": (0, "❤️"),
+    "boyfriend": (0, "❤️"),
+    "partner": (0, "❤️"),
+    "friend": (1, "🧑‍🤝‍🧑"),
+    "boss": (2, "🧑‍💼"),
+    "manager": (2, "🧑‍💼"),
+    "mom": (3, "👪"),
+    "mother": (3, "👪"),
+    "dad": (3, "👪"),
+    "father": (3, "👪"),
+    "parent": (3, "👪"),
+    "wife": (4, "💍"),
+    "husband": (4, "💍"),
+}
+# Longer keywords first so "girlfriend" isn't consumed as "friend".
+_REL_RE = re.compile("|".join(sorted(_REL_ICON, key=len, reverse=True)))
+
+
 def person_icon(relationship: str) -> str:
-    rel = (relationship or "").lower()
-    if "girlfriend" in rel or "boyfriend" in rel or "partner" in rel:
-        return "❤️"
-    if "friend" in rel:
-        return "🧑‍🤝‍🧑"
-    if "boss" in rel or "manager" in rel:
-        return "🧑‍💼"
-    if (
-        "mom" in rel
-        or "mother" in rel
-        or "dad" in rel
-        or "father" in rel
-        or "parent" in rel
-    ):
-        return "👪"
-    if "wife" in rel or "husband" in rel:
-        return "💍"
-    return "👤"
+    hits = _REL_RE.findall((relationship or "").lower())
+    if not hits:
+        return "👤"
+    return min(_REL_ICON[h] for h in hits)[1]
 
 
 main_tabs = st.tabs(["Write", "People", "Advanced"])
 
+# Settings that change what the Write tab displays (the injected-memory block
+# and the debug critique).
+_WRITE_VIEW_KEYS = (
+    "adv_apply_prefs",
+    "adv_use_people",
+    "adv_show_injected_memory",
+    "adv_show_debug",
+)
+
+
+def write_view_state() -> tuple:
+    return tuple(bool(st.session_state[k]) for k in _WRITE_VIEW_KEYS)
+
+
 # ================= ADVANCED =================
-with main_tabs[2]:
+# People and Advanced are fragments: their widgets rerun only their own tab.
+# Everything the Write tab needs at click time is read from session_state then;
+# a full rerun is forced only when what the Write tab shows would go stale.
+@st.fragment
+def advanced_tab():
+    write_view_before = write_view_state()
+
     st.subheader("Advanced settings")
     st.caption(f"Storage backend: **{storage.backend_name()}**")
 
@@ -209,15 +362,8 @@ with main_tabs[2]:
     with c6:
         st.session_state["adv_reading_level"] = st.selectbox(
             "Reading level",
-            ["simple", "general", "advanced"],
-            index=(
-                ["simple", "general", "advanced"].index(
-                    st.session_state["adv_reading_level"]
-                )
-                if st.session_state["adv_reading_level"]
-                in ["simple", "general", "advanced"]
-                else 1
-            ),
+            READING_LEVELS,
+            index=READING_LEVEL_IDX.get(st.session_state["adv_reading_level"], 1),
         )
 
     st.session_state["adv_audience"] = st.text_input(
@@ -230,15 +376,8 @@ with main_tabs[2]:
     st.markdown("### Model")
     st.session_state["adv_model"] = st.selectbox(
         "Model",
-        ["gpt-4o-mini", "gpt-4.1-mini", "gpt-4o"],
-        index=(
-            ["gpt-4o-mini", "gpt-4.1-mini", "gpt-4o"].index(
-                st.session_state["adv_model"]
-            )
-            if st.session_state["adv_model"]
-            in ["gpt-4o-mini", "gpt-4.1-mini", "gpt-4o"]
-            else 0
-        ),
+        MODELS,
+        index=MODEL_IDX.get(st.session_state["adv_model"], 0),
     )
     st.session_state["adv_temperature"] = st.slider(
         "Temperature", 0.0, 1.5, float(st.session_state["adv_temperature"]), 0.1
@@ -246,6 +385,13 @@ with main_tabs[2]:
     st.session_state["adv_top_p"] = st.slider(
         "Top-p", 0.1, 1.0, float(st.session_state["adv_top_p"]), 0.05
     )
+    st.session_state["adv_reuse_results"] = st.toggle(
+        "Reuse results for identical requests",
+        value=bool(st.session_state["adv_reuse_results"]),
+        help="Same inputs, model settings and memory return the earlier poem without "
+        "an API call. Off by default so every click samples a fresh poem; at "
+        "temperature 0 results are always reused.",
+    )
 
     st.divider()
     st.markdown("### Extra constraints")
@@ -260,43 +406,8 @@ with main_tabs[2]:
     )
     st.session_state["adv_tone"] = st.selectbox(
         "Tone",
-        [
-            "warm",
-            "funny",
-            "romantic",
-            "somber",
-            "hopeful",
-            "angry",
-            "motivational",
-            "surreal",
-            "minimalist",
-        ],
-        index=(
-            [
-                "warm",
-                "funny",
-                "romantic",
-                "somber",
-                "hopeful",
-                "angry",
-                "motivational",
-                "surreal",
-                "minimalist",
-            ].index(st.session_state["adv_tone"])
-            if st.session_state["adv_tone"]
-            in [
-                "warm",
-                "funny",
-                "romantic",
-                "somber",
-                "hopeful",
-                "angry",
-                "motivational",
-                "surreal",
-                "minimalist",
-            ]
-            else 0
-        ),
+        TONES,
+        index=TONE_IDX.get(st.session_state["adv_tone"], 0),
     )
     st.session_state["adv_show_debug"] = st.checkbox(
         "Show internal debug", value=bool(st.session_state["adv_show_debug"])
@@ -305,30 +416,57 @@ with main_tabs[2]:
     st.divider()
     st.markdown("### Data")
     show_taste = st.checkbox("See my taste profile", value=False)
-    if show_taste:
-        taste = storage.get_taste_profile(USER_ID)
-        st.json(taste)
+    try:
+        bundle = load_user_bundle(storage, USER_ID, storage.revision(USER_ID))
+    except Exception as e:
+        bundle = None
+        st.warning(f"Could not load your data yet: {e}")
+
+    if show_taste and bundle:
+        st.json(bundle["taste"])
 
     st.markdown("### Recent ratings (last 10)")
-    try:
-        recent = storage.list_ratings(USER_ID, limit=10)
+    if bundle:
+        recent = bundle["recent_ratings"]
         if not recent:
             st.info("No ratings yet.")
         else:
-            st.dataframe(recent, use_container_width=True)
-    except Exception as e:
-        st.warning(f"Could not load ratings yet: {e}")
-
-# LLM creation (always has defaults in session_state)
-llm = create_llm(
-    cfg,
-    model=st.session_state["adv_model"],
-    temperature=float(st.session_state["adv_temperature"]),
-    top_p=float(st.session_state["adv_top_p"]),
-)
+            st.dataframe(
+                ratings_df(storage, USER_ID, storage.revision(USER_ID)),
+                use_container_width=True,
+            )
+
+    if write_view_state() != write_view_before:
+        st.rerun(scope="app")
+
+
+with main_tabs[2]:
+    advanced_tab()
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm(model: str, temperature: float, top_p: float):
+    # One client (and HTTP connection pool) per setting combination for the
+    # process; reusing the same object also keeps the orchestrator's compiled
+    # graphs cached across reruns. Imported here so the OpenAI client stack
+    # loads on the first generate, not on the first page render.
+    from core.llm_factory import create_llm
+
+    return create_llm(cfg, model=model, temperature=temperature, top_p=top_p)
+
+
+def current_llm():
+    # Only button handlers need a client (always has defaults in session_state).
+    return get_llm(
+        st.session_state["adv_model"],
+        float(st.session_state["adv_temperature"]),
+        float(st.session_state["adv_top_p"]),
+    )
+
 
 # ================= PEOPLE =================
-with main_tabs[1]:
+@st.fragment
+def people_tab():
     st.subheader("People")
 
     with st.form("add_person_form", clear_on_submit=True):
@@ -342,13 +480,23 @@ with main_tabs[1]:
     if submitted:
         try:
             storage.add_person(USER_ID, name=name, relationship=relationship, note=note)
+            if (
+                st.session_state["adv_use_people"]
+                and st.session_state["adv_show_injected_memory"]
+            ):
+                # One-shot flash so the confirmation survives the app rerun.
+                st.session_state["people_flash"] = "Saved."
+                st.rerun(scope="app")
             st.success("Saved.")
         except Exception as e:
             st.error(str(e))
+    elif "people_flash" in st.session_state:
+        st.success(st.session_state.pop("people_flash"))
 
     st.divider()
     st.markdown("### Saved people")
-    people = storage.list_people(USER_ID)
+    # Read after the form: a save above bumps the revision, so this refetches.
+    people = load_user_bundle(storage, USER_ID, storage.revision(USER_ID))["people"]
     if not people:
         st.info("No people saved yet.")
     else:
@@ -358,16 +506,27 @@ with main_tabs[1]:
             if p.get("note"):
                 st.caption(p["note"])
 
+
+with main_tabs[1]:
+    people_tab()
+
 # ================= WRITE =================
 with main_tabs[0]:
     st.subheader("Write")
 
-    user_memory = build_user_memory(
-        storage,
-        USER_ID,
-        include_prefs=bool(st.session_state["adv_apply_prefs"]),
-        include_people=bool(st.session_state["adv_use_people"]),
-    )
+    include_prefs = bool(st.session_state["adv_apply_prefs"])
+    include_people = bool(st.session_state["adv_use_people"])
+    if include_prefs or include_people:
+        user_memory = build_user_memory(
+            storage,
+            USER_ID,
+            include_prefs=include_prefs,
+            include_people=include_people,
+            revision=storage.revision(USER_ID),
+        )
+    else:
+        # No memory sources: skip the cache lookup and any storage read.
+        user_memory = "None"
 
     if bool(st.session_state["adv_show_injected_memory"]):
         st.code(user_memory)
@@ -379,153 +538,211 @@ with main_tabs[0]:
     )
     st.session_state["poem_name"] = poem_name
 
-    theme_bg = st.text_area(
-        "Theme / Background",
-        height=120,
-        value="Write a sincere poem with specific details.",
-    )
+    # Format stays outside the form so the acrostic field can appear as soon
+    # as it is picked; everything else is sent together when a generate
+    # button is pressed, instead of rerunning the script per edit.
+    style = st.selectbox("Format", FORMATS, index=0)
 
-    writer_style_choice = st.selectbox(
-        "Writer Style", list(WRITER_STYLES.keys()), index=0
-    )
-    writer_vibe = WRITER_STYLES.get(writer_style_choice)
-
-    occasion = st.selectbox(
-        "Occasion (inspiration)",
-        [
-            "for inspiration",
-            "apology",
-            "birthday",
-            "anniversary",
-            "wedding",
-            "graduation",
-            "goodbye",
-            "valentine",
-        ],
-        index=0,
-    )
-    style = st.selectbox(
-        "Format",
-        [
-            "free_verse",
-            "haiku",
-            "limerick",
-            "acrostic",
-            "sonnet_like",
-            "spoken_word",
-            "rhymed_couplets",
-        ],
-        index=0,
-    )
-    line_count = st.slider("Length (lines)", 2, 60, 12)
-
-    acrostic_word = None
-    if style == "acrostic":
-        acrostic_word = st.text_input("Acrostic word", value="WINTER")
-
-    must_list = [
-        w.strip() for w in st.session_state["adv_must_include"].split(",") if w.strip()
-    ]
-    avoid_list = [
-        w.strip() for w in st.session_state["adv_avoid"].split(",") if w.strip()
-    ]
-    syllable_val = (st.session_state["adv_syllable_hints"] or "").strip() or None
-
-    req = PoemRequest(
-        occasion=occasion,
-        theme=theme_bg.strip() or "a meaningful moment",
-        audience=(st.session_state["adv_audience"].strip() or None),
-        style=style,
-        tone=st.session_state["adv_tone"],
-        writer_vibe=writer_vibe,
-        must_include=must_list,
-        avoid=avoid_list,
-        line_count=int(line_count),
-        rhyme=bool(st.session_state["adv_rhyme"]),
-        syllable_hints=syllable_val,
-        no_cliches=bool(st.session_state["adv_no_cliches"]),
-        reading_level=st.session_state["adv_reading_level"],
-        acrostic_word=(acrostic_word.strip() if acrostic_word else None),
-    )
+    with st.form("write_form", border=False):
+        theme_bg = st.text_area(
+            "Theme / Background",
+            height=120,
+            value="Write a sincere poem with specific details.",
+        )
 
-    c1, c2, c3, c4 = st.columns([1, 1, 1, 1])
-    with c1:
-        btn_fast = st.button("Generate only (fast)")
-    with c2:
-        btn_full = st.button("Generate + Improve", type="primary")
-    with c3:
-        btn_again = st.button(
-            "Improve again", disabled=len(st.session_state["versions"]) == 0
+        writer_style_choice = st.selectbox("Writer Style", WRITER_STYLE_NAMES, index=0)
+        writer_vibe = WRITER_STYLES.get(writer_style_choice)
+
+        occasion = st.selectbox("Occasion (inspiration)", OCCASIONS, index=0)
+        line_count = st.slider("Length (lines)", 2, 60, 12)
+
+        acrostic_word = None
+        if style == "acrostic":
+            acrostic_word = st.text_input("Acrostic word", value="WINTER")
+
+        c1, c2 = st.columns([1, 1])
+        with c1:
+            btn_fast = st.form_submit_button("Generate only (fast)")
+        with c2:
+            btn_full = st.form_submit_button("Generate + Improve", type="primary")
+
+    def build_request() -> PoemRequest:
+        # Validated only when a button needs it, not on every keystroke rerun.
+        return PoemRequest(
+            occasion=occasion,
+            theme=theme_bg.strip() or "a meaningful moment",
+            audience=(st.session_state["adv_audience"].strip() or None),
+            style=style,
+            tone=st.session_state["adv_tone"],
+            writer_vibe=writer_vibe,
+            must_include=split_csv(st.session_state["adv_must_include"]),
+            avoid=split_csv(st.session_state["adv_avoid"]),
+            line_count=int(line_count),
+            rhyme=bool(st.session_state["adv_rhyme"]),
+            syllable_hints=(
+                (st.session_state["adv_syllable_hints"] or "").strip() or None
+            ),
+            no_cliches=bool(st.session_state["adv_no_cliches"]),
+            reading_level=st.session_state["adv_reading_level"],
+            acrostic_word=(acrostic_word.strip() if acrostic_word else None),
         )
+
+    # Actions below update state in place and let the Output section render it in
+    # this same run. A full rerun is only needed when this flag must flip.
+    again_disabled = len(st.session_state["versions"]) == 0
+    c3, c4 = st.columns([1, 1])
+    with c3:
+        btn_again = st.button("Improve again", disabled=again_disabled)
     with c4:
         btn_clear = st.button("Clear versions")
 
     if btn_clear:
-        st.session_state["versions"] = []
-        st.session_state["rated_versions"] = set()
+        st.session_state["versions"] = deque(maxlen=MAX_VERSIONS)
+        st.session_state["version_count"] = 0
+        st.session_state["rated_versions"] = 0
         st.session_state["last_request"] = None
+        st.session_state["last_request_dump"] = None
         st.session_state["last_poem"] = None
         st.session_state["last_critique"] = None
         st.session_state["last_revised"] = None
-        st.rerun()
+        if not again_disabled:
+            st.rerun()
+
+    # ---- Button actions: update state; rerun only to enable "Improve again" ----
+    if btn_fast or btn_full:
+        # The orchestrator pulls in LangGraph/LangChain; import it on the first
+        # generate so page loads and People/Advanced edits don't pay for it.
+        from core.orchestrator import generate_only_stream, generate_and_improve
+
+        llm = current_llm()
+        req = build_request()
+        # Sampling (temperature > 0) gives a new poem per click unless the user
+        # opts in to reuse; at temperature 0 a rerun would repeat the same text.
+        use_cache = bool(st.session_state["adv_reuse_results"]) or (
+            float(st.session_state["adv_temperature"]) == 0
+        )
 
-    # ---- Button actions: update state then rerun ----
     if btn_fast:
-        out = generate_only(llm, req, user_memory=user_memory)
+        # Show the draft as it streams in: str items are the text so far, and the
+        # last item is this run's RunOutput (so the saved version is exactly the
+        # streamed one).
+        ph = st.empty()
+        for item in generate_only_stream(
+            llm, req, user_memory=user_memory, use_cache=use_cache
+        ):
+            if isinstance(item, str):
+                ph.code(item)
+            else:
+                out = item
+        ph.empty()
         if not out.ok:
             st.error(out.error_user)
         else:
             st.session_state["last_request"] = req
+            st.session_state["last_request_dump"] = req.model_dump()
             st.session_state["last_poem"] = out.poem
             st.session_state["last_critique"] = None
             st.session_state["last_revised"] = None
-            st.session_state["versions"] = [{"label": "Version 1", "text": out.poem}]
-            st.rerun()
+            st.session_state["versions"] = deque(
+                [make_version("Version 1", out.poem)], maxlen=MAX_VERSIONS
+            )
+            st.session_state["version_count"] = 1
+            st.session_state["rated_versions"] = 0
+            if again_disabled:
+                st.rerun()
 
     if btn_full:
-        out = generate_and_improve(llm, req, user_memory=user_memory)
+        out = generate_and_improve(
+            llm, req, user_memory=user_memory, use_cache=use_cache
+        )
         if not out.ok:
             st.error(out.error_user)
         else:
             st.session_state["last_request"] = req
+            st.session_state["last_request_dump"] = req.model_dump()
             st.session_state["last_poem"] = out.poem
             st.session_state["last_critique"] = out.critique
             st.session_state["last_revised"] = out.revised_poem
-            st.session_state["versions"] = [
-                {"label": "Version 1", "text": out.poem},
-                {"label": "Version 2 (Upgraded)", "text": out.revised_poem},
-            ]
-            st.rerun()
+            st.session_state["versions"] = deque(
+                [
+                    make_version("Version 1", out.poem),
+                    make_version("Version 2 (Upgraded)", out.revised_poem),
+                ],
+                maxlen=MAX_VERSIONS,
+            )
+            st.session_state["version_count"] = 2
+            st.session_state["rated_versions"] = 0
+            if again_disabled:
+                st.rerun()
 
     if btn_again:
-        last_req = st.session_state["last_request"]
-        base_poem = st.session_state["versions"][-1]["text"]
+        from core.orchestrator import improve_again
 
-        out = improve_again(llm, last_req, base_poem, user_memory=user_memory)
+        versions = st.session_state["versions"]
+        # Improve the latest main version; alternatives are side branches.
+        base_poem = next(
+            (v["text"] for v in reversed(versions) if not v.get("alternative")),
+            versions[-1]["text"],
+        )
+        prev_text = (base_poem or "").strip()
+
+        out = improve_again(
+            current_llm(),
+            st.session_state["last_request"],
+            base_poem,
+            user_memory=user_memory,
+            n_candidates=IMPROVE_CANDIDATES,
+        )
         if not out.ok:
             st.error(out.error_user)
         else:
-            new_text = (out.revised_poem or "").strip()
-            prev_text = (base_poem or "").strip()
+            candidates = []
+            for text in out.revised_candidates or [out.revised_poem]:
+                text = (text or "").strip()
+                if text and text != prev_text and text not in candidates:
+                    candidates.append(text)
 
-            if new_text == prev_text:
+            if not candidates:
                 st.error(
                     "Improve again produced the same poem. Try again (or adjust constraints)."
                 )
             else:
                 st.session_state["last_critique"] = out.critique
-                st.session_state["last_revised"] = out.revised_poem
-
-                next_num = len(st.session_state["versions"]) + 1
-                label = f"Version {next_num} (Upgraded)"
-                st.session_state["versions"].append(
-                    {"label": label, "text": out.revised_poem}
-                )
-                st.rerun()
+                st.session_state["last_revised"] = candidates[0]
+
+                st.session_state["version_count"] += 1
+                n = st.session_state["version_count"]
+                new_versions = [make_version(f"Version {n} (Upgraded)", candidates[0])]
+                new_versions += [
+                    make_version(f"Version {n} (Alternative {k})", text, True)
+                    for k, text in enumerate(candidates[1:], start=1)
+                ]
+                for v in new_versions:
+                    if len(versions) == versions.maxlen:
+                        # The oldest version drops off; keep rated bits aligned.
+                        st.session_state["rated_versions"] >>= 1
+                    versions.append(v)
 
     st.divider()
     st.subheader("Output")
 
+    # Each card and rating form is a fragment: interacting with one reruns only
+    # that fragment instead of the whole script.
+    @st.fragment
+    def version_card(i: int, label: str, text: str, safe_title: str):
+        # Heading and poem go out as one markdown element (the fence is longer
+        # than any backtick run in the poem, so it can't close early).
+        fence = "`" * max(3, longest_backtick_run(text) + 1)
+        st.markdown(f"### {label}\n\n{fence}\n{text}\n{fence}")
+        st.download_button(
+            f"Download {label} (.txt)",
+            poem_bytes(text),
+            file_name=f"{safe_title} - {label}.txt",
+            key=f"dl_{i}",
+            mime="text/plain",
+            on_click="ignore",
+        )
+
     def render_versions():
         if not st.session_state["versions"]:
             st.info("No versions yet. Click Generate.")
@@ -533,32 +750,24 @@ with main_tabs[0]:
 
         safe_title = (poem_name.strip() or "Untitled").replace("/", "-")
         for i, v in enumerate(st.session_state["versions"], start=1):
-            label = v["label"]
-            text = v["text"]
-            st.markdown(f"### {label}")
-            st.code(text)
-            st.download_button(
-                f"Download {label} (.txt)",
-                text,
-                file_name=f"{safe_title} - {label}.txt",
-                key=f"dl_{i}",
-            )
+            version_card(i, v["label"], v["text"], safe_title)
 
-    def rating_form(version_label: str, poem_text: str):
-        if version_label in st.session_state["rated_versions"]:
-            return
+    @st.fragment
+    def rating_form(index: int, version: dict, req_dump: dict, poem_title: str):
+        version_label = version["label"]
+        poem_text = version["text"]
+        form_key = version["form_key"]
 
-        st.divider()
-        st.subheader(f"Rate {version_label}")
+        slot = st.empty()
+        form_box = slot.container()
+        form_box.divider()
+        form_box.subheader(f"Rate {version_label}")
 
-        form_key = (
-            f"rate_{version_label}".replace(" ", "_").replace("(", "").replace(")", "")
-        )
         rating_key = f"rating_{form_key}"
         feedback_key = f"feedback_{form_key}"
         ending_key = f"ending_{form_key}"
 
-        with st.form(key=form_key, clear_on_submit=False):
+        with form_box.form(key=form_key, clear_on_submit=False):
             st.radio(
                 "Rating",
                 STAR_OPTIONS,
@@ -578,35 +787,38 @@ with main_tabs[0]:
 
         if submitted:
             try:
-                storage.add_rating(
+                storage.record_rating(
                     user_id=USER_ID,
-                    poem_name=poem_name,
+                    poem_name=poem_title,
                     version_label=version_label,
-                    request=req.model_dump(),
+                    request=req_dump,
                     poem_text=poem_text,
                     rating=int(st.session_state[rating_key]),
                     ending_pref=(st.session_state[ending_key] or None),
                     feedback=(st.session_state[feedback_key] or None),
                 )
-                storage.update_taste_profile(
-                    user_id=USER_ID,
-                    request=req.model_dump(),
-                    rating=int(st.session_state[rating_key]),
-                    ending_pref=(st.session_state[ending_key] or None),
-                )
 
-                st.session_state["rated_versions"].add(version_label)
-                st.success(
+                st.session_state["rated_versions"] |= 1 << index
+                # Swap the form for a confirmation in place instead of rerunning
+                # the app; the write bumped the storage revision, so user memory
+                # picks it up on the next run.
+                slot.success(
                     f"Saved rating: {stars_label(int(st.session_state[rating_key]))}"
                 )
-                st.rerun()
             except Exception as e:
                 st.error(str(e))
 
     render_versions()
 
-    for v in st.session_state["versions"]:
-        rating_form(v["label"], v["text"])
+    if st.session_state["versions"]:
+        # Ratings describe the request that produced the versions.
+        req_dump = st.session_state["last_request_dump"] or build_request().model_dump()
+        rated = st.session_state["rated_versions"]
+        for i, v in enumerate(st.session_state["versions"]):
+            # Rated versions skip the call entirely: a fragment that renders
+            # nothing can leave its previous output on screen.
+            if not rated & (1 << i):
+                rating_form(i, v, req_dump, poem_name)
 
     if bool(st.session_state["adv_show_debug"]) and st.session_state.get(
         "last_critique"
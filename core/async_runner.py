@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# One long-lived loop on a daemon thread. Async LLM clients keep connection
+# pools bound to the loop they were first used on, so every coroutine from the
+# (sync) Streamlit script thread is scheduled here instead of asyncio.run().
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOCK = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="wow-async-loop", daemon=True
+            ).start()
+            _LOOP = loop
+    return _LOOP
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine on the shared loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def iter_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Drive an async iterator on the shared loop and yield its items here as they
+    arrive. Errors from the iterator are re-raised after the last item; closing
+    the generator early (e.g. a Streamlit rerun) cancels the async side.
+    """
+    items: "queue.Queue[Any]" = queue.Queue()
+    done = object()
+
+    async def _pump() -> None:
+        try:
+            async for item in agen:
+                items.put(item)
+        finally:
+            items.put(done)
+
+    fut = asyncio.run_coroutine_threadsafe(_pump(), _get_loop())
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+        fut.result()
+    finally:
+        fut.cancel()
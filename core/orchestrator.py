@@ -1,9 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import (
+    Optional,
+    Dict,
+    Any,
+    AsyncIterator,
+    Hashable,
+    Iterator,
+    List,
+    Sequence,
+    Union,
+)
+
+import orjson
 
 from agent.schemas import PoemRequest
+from core.async_runner import iter_sync, run_sync
 from core.logging_setup import setup_logger
 from core.prompt_loader import load_prompts
 from agent.graph import build_graphs
@@ -16,25 +33,123 @@ class RunOutput:
     poem: Optional[str] = None
     critique: Optional[Dict[str, Any]] = None
     revised_poem: Optional[str] = None
+    # every sampled revision when more than one was requested (first == revised_poem)
+    revised_candidates: Optional[List[str]] = None
+
+
+class _LRUCache:
+    """Small thread-safe LRU; Streamlit serves sessions from several threads."""
+
+    def __init__(self, max_entries: int):
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._max = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+
+# Compiled graphs per LLM client, so graph wiring/validation runs once per client
+# instead of on every click. Entries hold the client itself, which keeps its id()
+# from being reused while cached.
+_GRAPH_CACHE = _LRUCache(max_entries=8)
+
+# Successful outputs keyed on everything that shapes the prompts (see _response_key).
+# A hit skips every LLM call for that run.
+_RESPONSE_CACHE = _LRUCache(max_entries=128)
 
 
 def _graphs(llm):
-    logger = setup_logger()
-    prompts = load_prompts()
-    return build_graphs(llm, prompts, logger)
+    hit = _GRAPH_CACHE.get(id(llm))
+    if hit is not None and hit[0] is llm:
+        return hit[1]
+
+    graphs = build_graphs(llm, load_prompts(), setup_logger())
+    _GRAPH_CACHE.put(id(llm), (llm, graphs))
+    return graphs
+
 
+# Free-text request fields where case and spacing don't change what is asked for.
+_LOOSE_FIELDS = ("theme", "audience", "syllable_hints")
 
-def generate_only(llm, req: PoemRequest, user_memory: str = "") -> RunOutput:
+
+def _normalize_request(request_dump: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold near-duplicate requests onto one cache key: free-text fields are
+    casefolded with whitespace runs collapsed. Only the key changes, not the prompt.
+    """
+    data = dict(request_dump)
+    for field in _LOOSE_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            data[field] = " ".join(value.split()).casefold()
+    return data
+
+
+def _response_key(
+    kind: str, llm, request_dump: Dict[str, Any], user_memory: str
+) -> str:
+    """Content hash of (prompt set, model settings, request, memory) for one run kind."""
+    payload = {
+        "kind": kind,
+        "prompts": load_prompts(),
+        "llm": [
+            type(llm).__name__,
+            getattr(llm, "model_name", None),
+            getattr(llm, "temperature", None),
+            getattr(llm, "top_p", None),
+        ],
+        "request": _normalize_request(request_dump),
+        "user_memory": user_memory or "None",
+    }
+    blob = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _initial_state(
+    req: PoemRequest,
+    user_memory: str,
+    request_dump: Optional[Dict[str, Any]] = None,
+    **extra,
+) -> Dict[str, Any]:
+    return {
+        "request": req,
+        "request_dump": req.model_dump() if request_dump is None else request_dump,
+        "user_memory": user_memory or "None",
+        **extra,
+    }
+
+
+async def generate_only_async(
+    llm, req: PoemRequest, user_memory: str = "", use_cache: bool = True
+) -> RunOutput:
     logger = setup_logger()
-    full_graph, _ = _graphs(llm)
+    request_dump = req.model_dump()
+    key = _response_key("generate_only", llm, request_dump, user_memory)
+    if use_cache:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    _, _, draft_graph = _graphs(llm)
     try:
-        result = full_graph.invoke(
-            {
-                "request": req,
-                "user_memory": user_memory or "None",
-            }
+        result = await draft_graph.ainvoke(
+            _initial_state(req, user_memory, request_dump)
         )
-        return RunOutput(ok=True, poem=result.get("poem"))
+        out = RunOutput(ok=True, poem=result.get("poem"))
+        _RESPONSE_CACHE.put(key, out)
+        return out
     except Exception as e:
         logger.error(f"generate_only_failed err={type(e).__name__}:{e}")
         return RunOutput(
@@ -42,23 +157,86 @@ def generate_only(llm, req: PoemRequest, user_memory: str = "") -> RunOutput:
         )
 
 
-def generate_and_improve(llm, req: PoemRequest, user_memory: str = "") -> RunOutput:
+async def generate_only_stream_async(
+    llm, req: PoemRequest, user_memory: str = "", use_cache: bool = True
+) -> AsyncIterator[Union[str, RunOutput]]:
+    """
+    Generate-only flow that streams the poem as the model writes it. Yields the
+    text so far (str) after each chunk, then the run's RunOutput as the last item;
+    callers should keep that RunOutput rather than look the result up again.
+    A retried model call starts a new message, so the text so far restarts with
+    it instead of repeating the first attempt's tokens. A cache hit yields the
+    whole poem once. Failures end with an ok=False RunOutput; nothing is cached.
+    """
+    logger = setup_logger()
+    request_dump = req.model_dump()
+    key = _response_key("generate_only", llm, request_dump, user_memory)
+    if use_cache:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            yield cached.poem
+            yield cached
+            return
+
+    _, _, draft_graph = _graphs(llm)
+    final: Dict[str, Any] = {}
+    parts: List[str] = []
+    message_id = None
+    try:
+        async for mode, data in draft_graph.astream(
+            _initial_state(req, user_memory, request_dump),
+            stream_mode=["messages", "values"],
+        ):
+            if mode == "values":
+                final = data
+                continue
+            chunk, _ = data
+            if not (isinstance(chunk.content, str) and chunk.content):
+                continue
+            if chunk.id != message_id:
+                message_id = chunk.id
+                parts = []
+            parts.append(chunk.content)
+            yield "".join(parts)
+    except Exception as e:
+        logger.error(f"generate_only_stream_failed err={type(e).__name__}:{e}")
+        final = {}
+
+    if not final.get("poem"):
+        yield RunOutput(
+            ok=False, error_user="Could not generate the poem. Please try again."
+        )
+        return
+
+    out = RunOutput(ok=True, poem=final["poem"])
+    _RESPONSE_CACHE.put(key, out)
+    yield out
+
+
+async def generate_and_improve_async(
+    llm, req: PoemRequest, user_memory: str = "", use_cache: bool = True
+) -> RunOutput:
     logger = setup_logger()
-    full_graph, _ = _graphs(llm)
+    request_dump = req.model_dump()
+    key = _response_key("generate_and_improve", llm, request_dump, user_memory)
+    if use_cache:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    full_graph, _, _ = _graphs(llm)
     try:
-        result = full_graph.invoke(
-            {
-                "request": req,
-                "user_memory": user_memory or "None",
-            }
+        result = await full_graph.ainvoke(
+            _initial_state(req, user_memory, request_dump)
         )
-        critique = result.get("critique")
-        return RunOutput(
+        out = RunOutput(
             ok=True,
             poem=result.get("poem"),
-            critique=critique.model_dump() if critique else None,
+            critique=result.get("critique_dump"),
             revised_poem=result.get("revised_poem"),
         )
+        _RESPONSE_CACHE.put(key, out)
+        return out
     except Exception as e:
         logger.error(f"generate_and_improve_failed err={type(e).__name__}:{e}")
         return RunOutput(
@@ -66,25 +244,82 @@ def generate_and_improve(llm, req: PoemRequest, user_memory: str = "") -> RunOut
         )
 
 
-def improve_again(llm, req: PoemRequest, poem: str, user_memory: str = "") -> RunOutput:
+async def generate_and_improve_many_async(
+    llm,
+    reqs: Sequence[PoemRequest],
+    user_memory: str = "",
+    max_concurrency: int = 4,
+) -> List[RunOutput]:
+    """
+    Run the full flow for many requests at once (bulk/offline use).
+    Runs are gathered on the event loop, at most max_concurrency in flight;
+    one failed request doesn't fail the others.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _one(req: PoemRequest) -> RunOutput:
+        async with sem:
+            return await generate_and_improve_async(llm, req, user_memory)
+
+    return list(await asyncio.gather(*(_one(req) for req in reqs)))
+
+
+async def improve_again_async(
+    llm, req: PoemRequest, poem: str, user_memory: str = "", n_candidates: int = 1
+) -> RunOutput:
     logger = setup_logger()
-    _, improve_graph = _graphs(llm)
+    _, improve_graph, _ = _graphs(llm)
     try:
-        result = improve_graph.invoke(
-            {
-                "request": req,
-                "poem": poem,
-                "user_memory": user_memory or "None",
-            }
+        result = await improve_graph.ainvoke(
+            _initial_state(req, user_memory, poem=poem, n_candidates=n_candidates)
         )
-        critique = result.get("critique")
         return RunOutput(
             ok=True,
-            critique=critique.model_dump() if critique else None,
+            critique=result.get("critique_dump"),
             revised_poem=result.get("revised_poem"),
+            revised_candidates=result.get("revised_candidates"),
         )
     except Exception as e:
         logger.error(f"improve_again_failed err={type(e).__name__}:{e}")
         return RunOutput(
             ok=False, error_user="Could not improve again. Please try again."
         )
+
+
+# Sync entry points for the Streamlit script thread; the coroutines run on the
+# shared loop in core.async_runner.
+
+
+def generate_only(
+    llm, req: PoemRequest, user_memory: str = "", use_cache: bool = True
+) -> RunOutput:
+    return run_sync(generate_only_async(llm, req, user_memory, use_cache))
+
+
+def generate_only_stream(
+    llm, req: PoemRequest, user_memory: str = "", use_cache: bool = True
+) -> Iterator[Union[str, RunOutput]]:
+    return iter_sync(generate_only_stream_async(llm, req, user_memory, use_cache))
+
+
+def generate_and_improve(
+    llm, req: PoemRequest, user_memory: str = "", use_cache: bool = True
+) -> RunOutput:
+    return run_sync(generate_and_improve_async(llm, req, user_memory, use_cache))
+
+
+def generate_and_improve_many(
+    llm,
+    reqs: Sequence[PoemRequest],
+    user_memory: str = "",
+    max_concurrency: int = 4,
+) -> List[RunOutput]:
+    return run_sync(
+        generate_and_improve_many_async(llm, reqs, user_memory, max_concurrency)
+    )
+
+
+def improve_again(
+    llm, req: PoemRequest, poem: str, user_memory: str = "", n_candidates: int = 1
+) -> RunOutput:
+    return run_sync(improve_again_async(llm, req, poem, user_memory, n_candidates))
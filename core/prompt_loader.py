@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Optional, Any
+from string import Formatter
+from typing import Dict, List, Optional, Any, Tuple
 import yaml
 
 from core.logging_setup import setup_logger
@@ -9,6 +10,9 @@ from core.logging_setup import setup_logger
 # Cache to avoid reload churn during Streamlit reruns.
 _PROMPT_CACHE: Optional[Dict[str, Dict[str, str]]] = None
 
+# A template pre-parsed into (literal_text, field_name_or_None) pairs.
+CompiledTemplate = List[Tuple[str, Optional[str]]]
+
 
 def _validate_prompt_block(name: str, block: Any) -> Dict[str, str]:
     """
@@ -65,3 +69,24 @@ def load_prompts(path: str = "prompts/prompts.yaml") -> Dict[str, Dict[str, str]
     logger.info(f"Loaded prompts from {path}")
     _PROMPT_CACHE = normalized
     return normalized
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Parse a str.format-style template once into (literal, field) segments.
+    Only plain {name} placeholders are supported (no format specs/conversions).
+    """
+    segments: CompiledTemplate = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            raise ValueError(f"Unsupported prompt placeholder: {{{field}}}")
+        segments.append((literal, field))
+    return segments
+
+
+def render_template(segments: CompiledTemplate, ctx: Dict[str, Any]) -> str:
+    """Fill a compiled template; equivalent to template.format(**ctx)."""
+    return "".join(
+        literal if field is None else literal + str(ctx[field])
+        for literal, field in segments
+    )
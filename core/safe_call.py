@@ -2,7 +2,7 @@ from __future__ import annotations
 import time
 import uuid
 from dataclasses import dataclass
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from tenacity import (
     retry,
@@ -21,6 +21,8 @@ class SafeResult:
     error_debug: Optional[str] = None
     latency_ms: Optional[int] = None
     retry_count: int = 0
+    # fn's raw return value, for callers that need more than the text content
+    value: Any = None
 
 
 def _is_transient(e: Exception) -> bool:
@@ -40,7 +42,44 @@ def _is_transient(e: Exception) -> bool:
     )
 
 
-def safe_invoke(logger, *, user_error: str, fn: Callable[[], Any]) -> SafeResult:
+def _ok(request_id: str, resp: Any, start: float, retries: int) -> SafeResult:
+    latency = int((time.time() - start) * 1000)
+    return SafeResult(
+        ok=True,
+        request_id=request_id,
+        # e.g. an LLMResult from agenerate(n=...) has no .content; callers read .value
+        content=getattr(resp, "content", None),
+        latency_ms=latency,
+        retry_count=max(0, retries - 1),
+        value=resp,
+    )
+
+
+def _failed(
+    logger, request_id: str, user_error: str, e: Exception, start: float, retries: int
+) -> SafeResult:
+    latency = int((time.time() - start) * 1000)
+    logger.error(
+        f"request_id={request_id} model_call_failed latency_ms={latency} err={type(e).__name__}:{e}"
+    )
+    return SafeResult(
+        ok=False,
+        request_id=request_id,
+        error_user=user_error,
+        error_debug=f"{type(e).__name__}: {e}",
+        latency_ms=latency,
+        retry_count=max(0, retries - 1),
+    )
+
+
+async def safe_ainvoke(
+    logger,
+    fn: Callable[..., Awaitable[Any]],
+    *args: Any,
+    user_error: str,
+    **kwargs: Any,
+) -> SafeResult:
+    """Await fn(*args, **kwargs) with retries on transient errors; never raises."""
     request_id = str(uuid.uuid4())[:8]
     start = time.time()
     retries = {"count": 0}
@@ -51,9 +90,9 @@ def safe_invoke(logger, *, user_error: str, fn: Callable[[], Any]) -> SafeResult
         wait=wait_exponential_jitter(initial=0.5, max=3.0),
         retry=retry_if_exception(lambda e: _is_transient(e)),
     )
-    def _run():
+    async def _run():
         try:
-            return fn()
+            return await fn(*args, **kwargs)
         except Exception as e:
             retries["count"] += 1
             logger.warning(
@@ -62,28 +101,6 @@ def safe_invoke(logger, *, user_error: str, fn: Callable[[], Any]) -> SafeResult
             raise
 
     try:
-        resp = _run()
-        latency = int((time.time() - start) * 1000)
-        content = getattr(resp, "content", None)
-        if content is None:
-            content = str(resp)
-        return SafeResult(
-            ok=True,
-            request_id=request_id,
-            content=content,
-            latency_ms=latency,
-            retry_count=max(0, retries["count"] - 1),
-        )
+        return _ok(request_id, await _run(), start, retries["count"])
     except Exception as e:
-        latency = int((time.time() - start) * 1000)
-        logger.error(
-            f"request_id={request_id} model_call_failed latency_ms={latency} err={type(e).__name__}:{e}"
-        )
-        return SafeResult(
-            ok=False,
-            request_id=request_id,
-            error_user=user_error,
-            error_debug=f"{type(e).__name__}: {e}",
-            latency_ms=latency,
-            retry_count=max(0, retries["count"] - 1),
-        )
+        return _failed(logger, request_id, user_error, e, start, retries["count"])
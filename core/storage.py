@@ -3,7 +3,9 @@ from __future__ import annotations
 import json
 import os
 import sqlite3
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -11,6 +13,13 @@ from core.logging_setup import setup_logger
 
 SQLITE_PATH = Path("data/app.db")
 
+# Per-user write counters, bumped by every mutating call. They live at module
+# level rather than on the storage object: the app's instance is shared by every
+# session via st.cache_resource, but any other Storage built in this process
+# (or a fresh one after that cache is cleared) must see the same revisions.
+_REVISIONS: Dict[str, int] = {}
+_REVISIONS_LOCK = threading.Lock()
+
 # --------- Public API (what app.py uses) ---------
 
 
@@ -52,6 +61,87 @@ class Storage:
 
     def get_taste_profile(self, user_id: str) -> Dict[str, Any]: ...
 
+    def record_rating(
+        self,
+        user_id: str,
+        poem_name: str,
+        version_label: str,
+        request: Dict[str, Any],
+        poem_text: str,
+        rating: int,
+        ending_pref: Optional[str],
+        feedback: Optional[str],
+    ) -> int:
+        """add_rating + update_taste_profile; backends do both in one transaction."""
+        new_id = self.add_rating(
+            user_id=user_id,
+            poem_name=poem_name,
+            version_label=version_label,
+            request=request,
+            poem_text=poem_text,
+            rating=rating,
+            ending_pref=ending_pref,
+            feedback=feedback,
+        )
+        self.update_taste_profile(
+            user_id=user_id, request=request, rating=rating, ending_pref=ending_pref
+        )
+        return new_id
+
+    def get_user_bundle(self, user_id: str, ratings_limit: int = 10) -> Dict[str, Any]:
+        """Taste profile, people and recent ratings for user_id in one round-trip."""
+        return {
+            "taste": self.get_taste_profile(user_id),
+            "people": self.list_people(user_id),
+            "recent_ratings": self.list_ratings(user_id, limit=ratings_limit),
+        }
+
+    def revision(self, user_id: str) -> int:
+        """Changes whenever this process writes people/ratings/taste for user_id."""
+        return _REVISIONS.get(user_id, 0)
+
+    def _bump_revision(self, user_id: str) -> None:
+        with _REVISIONS_LOCK:
+            _REVISIONS[user_id] = _REVISIONS.get(user_id, 0) + 1
+
+
+def _taste_from_row(data: Optional[Any]) -> Dict[str, Any]:
+    """Map a taste_profile row (sqlite3.Row or dict) to the public profile dict."""
+    if not data:
+        return {
+            "total_ratings": 0,
+            "prefer_rhyme_score": 0.0,
+            "avg_line_count": None,
+            "reading_level_guess": None,
+            "ending_guess": None,
+        }
+
+    total = int(data["total_ratings"])
+    reading_counts = {
+        "simple": int(data["reading_simple_count"]),
+        "general": int(data["reading_general_count"]),
+        "advanced": int(data["reading_advanced_count"]),
+    }
+    reading_guess = max(reading_counts, key=reading_counts.get) if total > 0 else None
+
+    ending_counts = {
+        "soft": int(data["ending_soft_count"]),
+        "twist": int(data["ending_twist_count"]),
+        "punchline": int(data["ending_punchline_count"]),
+        "hopeful": int(data["ending_hopeful_count"]),
+    }
+    ending_guess = max(ending_counts, key=ending_counts.get) if total > 0 else None
+
+    return {
+        "total_ratings": total,
+        "prefer_rhyme_score": float(data["prefer_rhyme_score"]),
+        "avg_line_count": float(data["avg_line_count"]),
+        "reading_level_guess": reading_guess,
+        "ending_guess": ending_guess,
+        "reading_counts": reading_counts,
+        "ending_counts": ending_counts,
+    }
+
 
 def get_storage() -> Storage:
     db_url = os.getenv("DATABASE_URL", "").strip()
@@ -63,6 +153,133 @@ def get_storage() -> Storage:
 # --------- SQLite implementation (local fallback) ---------
 
 
+def _sqlite_insert_rating(
+    conn: sqlite3.Connection,
+    user_id: str,
+    poem_name: str,
+    version_label: str,
+    request: Dict[str, Any],
+    poem_text: str,
+    rating: int,
+    ending_pref: Optional[str],
+    feedback: Optional[str],
+) -> int:
+    cur = conn.execute(
+        """
+        INSERT INTO ratings(user_id, poem_name, version_label, request_json, poem_text, rating, ending_pref, feedback)
+        VALUES(?,?,?,?,?,?,?,?)
+        """,
+        (
+            user_id,
+            poem_name.strip() or "Untitled",
+            version_label,
+            json.dumps(request, ensure_ascii=False),
+            poem_text,
+            rating,
+            ending_pref,
+            feedback.strip() if feedback else None,
+        ),
+    )
+    return int(cur.lastrowid)
+
+
+def _sqlite_apply_taste(
+    conn: sqlite3.Connection,
+    user_id: str,
+    request: Dict[str, Any],
+    rating: int,
+    ending_pref: Optional[str],
+) -> None:
+    rhyme = bool(request.get("rhyme", False))
+    line_count = int(request.get("line_count", 12))
+    reading_level = (request.get("reading_level") or "general").lower()
+
+    strength = rating - 3  # 1->-2, 3->0, 5->+2
+    rhyme_delta = float(strength if rhyme else -strength)
+
+    ending = (ending_pref or "").lower().strip()
+    ending_col = {
+        "soft": "ending_soft_count",
+        "twist": "ending_twist_count",
+        "punchline": "ending_punchline_count",
+        "hopeful": "ending_hopeful_count",
+    }.get(ending)
+
+    conn.execute(
+        "INSERT INTO taste_profile(user_id, total_ratings) VALUES(?,0) ON CONFLICT(user_id) DO NOTHING",
+        (user_id,),
+    )
+
+    row = conn.execute(
+        "SELECT total_ratings, prefer_rhyme_score, avg_line_count, reading_simple_count, reading_general_count, reading_advanced_count, "
+        "ending_soft_count, ending_twist_count, ending_punchline_count, ending_hopeful_count "
+        "FROM taste_profile WHERE user_id=?",
+        (user_id,),
+    ).fetchone()
+
+    total = int(row["total_ratings"])
+    new_total = total + 1
+
+    prev_avg = float(row["avg_line_count"])
+    new_avg = (prev_avg * total + line_count) / new_total
+
+    new_rhyme_score = float(row["prefer_rhyme_score"]) + rhyme_delta
+
+    simple = int(row["reading_simple_count"])
+    general = int(row["reading_general_count"])
+    advanced = int(row["reading_advanced_count"])
+    if reading_level == "simple":
+        simple += 1
+    elif reading_level == "advanced":
+        advanced += 1
+    else:
+        general += 1
+
+    soft = int(row["ending_soft_count"])
+    twist = int(row["ending_twist_count"])
+    punch = int(row["ending_punchline_count"])
+    hopeful = int(row["ending_hopeful_count"])
+    if ending_col == "ending_soft_count":
+        soft += 1
+    elif ending_col == "ending_twist_count":
+        twist += 1
+    elif ending_col == "ending_punchline_count":
+        punch += 1
+    elif ending_col == "ending_hopeful_count":
+        hopeful += 1
+
+    conn.execute(
+        """
+        UPDATE taste_profile SET
+            total_ratings=?,
+            prefer_rhyme_score=?,
+            avg_line_count=?,
+            reading_simple_count=?,
+            reading_general_count=?,
+            reading_advanced_count=?,
+            ending_soft_count=?,
+            ending_twist_count=?,
+            ending_punchline_count=?,
+            ending_hopeful_count=?,
+            updated_at=datetime('now')
+        WHERE user_id=?
+        """,
+        (
+            new_total,
+            new_rhyme_score,
+            new_avg,
+            simple,
+            general,
+            advanced,
+            soft,
+            twist,
+            punch,
+            hopeful,
+            user_id,
+        ),
+    )
+
+
 @dataclass
 class SQLiteStorage(Storage):
     path: Path
@@ -146,6 +363,7 @@ class SQLiteStorage(Storage):
                 "INSERT INTO people(user_id, name, relationship, note) VALUES(?,?,?,?)",
                 (user_id, name, relationship, note.strip() if note else None),
             )
+        self._bump_revision(user_id)
 
     def list_people(self, user_id: str) -> List[Dict[str, Any]]:
         with self._connect() as conn:
@@ -171,23 +389,19 @@ class SQLiteStorage(Storage):
             raise ValueError("Rating must be 1..5")
 
         with self._connect() as conn:
-            cur = conn.execute(
-                """
-                INSERT INTO ratings(user_id, poem_name, version_label, request_json, poem_text, rating, ending_pref, feedback)
-                VALUES(?,?,?,?,?,?,?,?)
-                """,
-                (
-                    user_id,
-                    poem_name.strip() or "Untitled",
-                    version_label,
-                    json.dumps(request, ensure_ascii=False),
-                    poem_text,
-                    rating,
-                    ending_pref,
-                    feedback.strip() if feedback else None,
-                ),
+            new_id = _sqlite_insert_rating(
+                conn,
+                user_id,
+                poem_name,
+                version_label,
+                request,
+                poem_text,
+                rating,
+                ending_pref,
+                feedback,
             )
-            return int(cur.lastrowid)
+        self._bump_revision(user_id)
+        return new_id
 
     def list_ratings(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         limit = int(limit)
@@ -234,158 +448,264 @@ class SQLiteStorage(Storage):
         rating: int,
         ending_pref: Optional[str],
     ) -> None:
-        rhyme = bool(request.get("rhyme", False))
-        line_count = int(request.get("line_count", 12))
-        reading_level = (request.get("reading_level") or "general").lower()
-
-        strength = rating - 3  # 1->-2, 3->0, 5->+2
-        rhyme_delta = float(strength if rhyme else -strength)
+        with self._connect() as conn:
+            _sqlite_apply_taste(conn, user_id, request, rating, ending_pref)
+        self._bump_revision(user_id)
 
-        ending = (ending_pref or "").lower().strip()
-        ending_col = {
-            "soft": "ending_soft_count",
-            "twist": "ending_twist_count",
-            "punchline": "ending_punchline_count",
-            "hopeful": "ending_hopeful_count",
-        }.get(ending)
+    def record_rating(
+        self,
+        user_id: str,
+        poem_name: str,
+        version_label: str,
+        request: Dict[str, Any],
+        poem_text: str,
+        rating: int,
+        ending_pref: Optional[str],
+        feedback: Optional[str],
+    ) -> int:
+        rating = int(rating)
+        if rating < 1 or rating > 5:
+            raise ValueError("Rating must be 1..5")
 
+        # One connection and one commit: the rating and the profile update it
+        # feeds land together or not at all.
         with self._connect() as conn:
-            conn.execute(
-                "INSERT INTO taste_profile(user_id, total_ratings) VALUES(?,0) ON CONFLICT(user_id) DO NOTHING",
-                (user_id,),
+            new_id = _sqlite_insert_rating(
+                conn,
+                user_id,
+                poem_name,
+                version_label,
+                request,
+                poem_text,
+                rating,
+                ending_pref,
+                feedback,
             )
+            _sqlite_apply_taste(conn, user_id, request, rating, ending_pref)
+        self._bump_revision(user_id)
+        return new_id
 
+    def get_taste_profile(self, user_id: str) -> Dict[str, Any]:
+        with self._connect() as conn:
             row = conn.execute(
-                "SELECT total_ratings, prefer_rhyme_score, avg_line_count, reading_simple_count, reading_general_count, reading_advanced_count, "
-                "ending_soft_count, ending_twist_count, ending_punchline_count, ending_hopeful_count "
-                "FROM taste_profile WHERE user_id=?",
+                "SELECT * FROM taste_profile WHERE user_id=?",
                 (user_id,),
             ).fetchone()
+        return _taste_from_row(row)
 
-            total = int(row["total_ratings"])
-            new_total = total + 1
-
-            prev_avg = float(row["avg_line_count"])
-            new_avg = (prev_avg * total + line_count) / new_total
-
-            new_rhyme_score = float(row["prefer_rhyme_score"]) + rhyme_delta
-
-            simple = int(row["reading_simple_count"])
-            general = int(row["reading_general_count"])
-            advanced = int(row["reading_advanced_count"])
-            if reading_level == "simple":
-                simple += 1
-            elif reading_level == "advanced":
-                advanced += 1
-            else:
-                general += 1
-
-            soft = int(row["ending_soft_count"])
-            twist = int(row["ending_twist_count"])
-            punch = int(row["ending_punchline_count"])
-            hopeful = int(row["ending_hopeful_count"])
-            if ending_col == "ending_soft_count":
-                soft += 1
-            elif ending_col == "ending_twist_count":
-                twist += 1
-            elif ending_col == "ending_punchline_count":
-                punch += 1
-            elif ending_col == "ending_hopeful_count":
-                hopeful += 1
-
-            conn.execute(
-                """
-                UPDATE taste_profile SET
-                    total_ratings=?,
-                    prefer_rhyme_score=?,
-                    avg_line_count=?,
-                    reading_simple_count=?,
-                    reading_general_count=?,
-                    reading_advanced_count=?,
-                    ending_soft_count=?,
-                    ending_twist_count=?,
-                    ending_punchline_count=?,
-                    ending_hopeful_count=?,
-                    updated_at=datetime('now')
-                WHERE user_id=?
-                """,
-                (
-                    new_total,
-                    new_rhyme_score,
-                    new_avg,
-                    simple,
-                    general,
-                    advanced,
-                    soft,
-                    twist,
-                    punch,
-                    hopeful,
-                    user_id,
-                ),
-            )
-
-    def get_taste_profile(self, user_id: str) -> Dict[str, Any]:
+    def get_user_bundle(self, user_id: str, ratings_limit: int = 10) -> Dict[str, Any]:
+        # Local file: one connection for the three reads is all there is to save.
         with self._connect() as conn:
-            row = conn.execute(
+            taste = conn.execute(
                 "SELECT * FROM taste_profile WHERE user_id=?",
                 (user_id,),
             ).fetchone()
-
-        if not row:
-            return {
-                "total_ratings": 0,
-                "prefer_rhyme_score": 0.0,
-                "avg_line_count": None,
-                "reading_level_guess": None,
-                "ending_guess": None,
-            }
-
-        total = int(row["total_ratings"])
-        reading_counts = {
-            "simple": int(row["reading_simple_count"]),
-            "general": int(row["reading_general_count"]),
-            "advanced": int(row["reading_advanced_count"]),
-        }
-        reading_guess = (
-            max(reading_counts, key=reading_counts.get) if total > 0 else None
-        )
-
-        ending_counts = {
-            "soft": int(row["ending_soft_count"]),
-            "twist": int(row["ending_twist_count"]),
-            "punchline": int(row["ending_punchline_count"]),
-            "hopeful": int(row["ending_hopeful_count"]),
-        }
-        ending_guess = max(ending_counts, key=ending_counts.get) if total > 0 else None
-
+            people = conn.execute(
+                "SELECT id, name, relationship, note, created_at FROM people WHERE user_id=? ORDER BY id DESC",
+                (user_id,),
+            ).fetchall()
+            ratings = conn.execute(
+                """
+                SELECT created_at, poem_name, version_label, rating, ending_pref, feedback
+                FROM ratings
+                WHERE user_id=?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (user_id, int(ratings_limit)),
+            ).fetchall()
         return {
-            "total_ratings": total,
-            "prefer_rhyme_score": float(row["prefer_rhyme_score"]),
-            "avg_line_count": float(row["avg_line_count"]),
-            "reading_level_guess": reading_guess,
-            "ending_guess": ending_guess,
-            "reading_counts": reading_counts,
-            "ending_counts": ending_counts,
+            "taste": _taste_from_row(taste),
+            "people": [dict(r) for r in people],
+            "recent_ratings": [dict(r) for r in ratings],
         }
 
 
 # --------- Postgres implementation (Supabase) ---------
 
 
+def _pg_insert_rating(
+    cur,
+    user_id: str,
+    poem_name: str,
+    version_label: str,
+    request: Dict[str, Any],
+    poem_text: str,
+    rating: int,
+    ending_pref: Optional[str],
+    feedback: Optional[str],
+) -> int:
+    cur.execute(
+        """
+        INSERT INTO ratings(user_id, poem_name, version_label, request_json, poem_text, rating, ending_pref, feedback)
+        VALUES(%s,%s,%s,%s,%s,%s,%s,%s)
+        RETURNING id
+        """,
+        (
+            user_id,
+            poem_name.strip() or "Untitled",
+            version_label,
+            json.dumps(request, ensure_ascii=False),
+            poem_text,
+            rating,
+            ending_pref,
+            feedback.strip() if feedback else None,
+        ),
+    )
+    return int(cur.fetchone()[0])
+
+
+def _pg_apply_taste(
+    cur,
+    user_id: str,
+    request: Dict[str, Any],
+    rating: int,
+    ending_pref: Optional[str],
+) -> None:
+    rhyme = bool(request.get("rhyme", False))
+    line_count = int(request.get("line_count", 12))
+    reading_level = (request.get("reading_level") or "general").lower()
+
+    strength = rating - 3
+    rhyme_delta = float(strength if rhyme else -strength)
+    ending = (ending_pref or "").lower().strip()
+
+    cur.execute(
+        "INSERT INTO taste_profile(user_id, total_ratings) VALUES(%s,0) ON CONFLICT (user_id) DO NOTHING",
+        (user_id,),
+    )
+    cur.execute(
+        """
+        SELECT total_ratings, prefer_rhyme_score, avg_line_count,
+               reading_simple_count, reading_general_count, reading_advanced_count,
+               ending_soft_count, ending_twist_count, ending_punchline_count, ending_hopeful_count
+        FROM taste_profile WHERE user_id=%s
+        """,
+        (user_id,),
+    )
+    row = cur.fetchone()
+    (
+        total,
+        prefer_rhyme_score,
+        avg_line_count,
+        rs,
+        rg,
+        ra,
+        es,
+        et,
+        ep,
+        eh,
+    ) = row
+
+    total = int(total)
+    new_total = total + 1
+    new_avg = (float(avg_line_count) * total + line_count) / new_total
+    new_rhyme_score = float(prefer_rhyme_score) + rhyme_delta
+
+    if reading_level == "simple":
+        rs += 1
+    elif reading_level == "advanced":
+        ra += 1
+    else:
+        rg += 1
+
+    if ending == "soft":
+        es += 1
+    elif ending == "twist":
+        et += 1
+    elif ending == "punchline":
+        ep += 1
+    elif ending == "hopeful":
+        eh += 1
+
+    cur.execute(
+        """
+        UPDATE taste_profile SET
+            total_ratings=%s,
+            prefer_rhyme_score=%s,
+            avg_line_count=%s,
+            reading_simple_count=%s,
+            reading_general_count=%s,
+            reading_advanced_count=%s,
+            ending_soft_count=%s,
+            ending_twist_count=%s,
+            ending_punchline_count=%s,
+            ending_hopeful_count=%s,
+            updated_at=now()
+        WHERE user_id=%s
+        """,
+        (
+            new_total,
+            new_rhyme_score,
+            new_avg,
+            rs,
+            rg,
+            ra,
+            es,
+            et,
+            ep,
+            eh,
+            user_id,
+        ),
+    )
+
+
 @dataclass
 class PostgresStorage(Storage):
     database_url: str
+    # Lazily opened psycopg_pool.ConnectionPool; the app keeps one storage object
+    # per process, so connections are reused across reruns and sessions.
+    _pool: Any = field(default=None, init=False, repr=False, compare=False)
+    _pool_lock: Any = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
     def backend_name(self) -> str:
         return "postgres:DATABASE_URL"
 
+    def _get_pool(self):
+        """Shared pool, or None when psycopg_pool isn't installed."""
+        if self._pool is None:
+            try:
+                from psycopg_pool import ConnectionPool
+            except Exception:
+                return None
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(
+                        self.database_url,
+                        # Pooled connections repeat the same statements, which
+                        # makes psycopg prepare them; server-side prepared
+                        # statements break behind Supabase/PgBouncer transaction
+                        # pooling, so keep them off.
+                        kwargs={"prepare_threshold": None},
+                        # Connections can sit idle for up to max_lifetime; check
+                        # them on checkout so one dropped by the server or pooler
+                        # is replaced instead of failing the caller's query.
+                        check=ConnectionPool.check_connection,
+                        min_size=1,
+                        max_size=5,
+                        timeout=30,
+                        max_lifetime=1800,
+                        open=True,
+                    )
+        return self._pool
+
     def _connect(self):
+        """
+        Context manager yielding a connection. With psycopg_pool it is borrowed
+        from the pool and returned on exit (committed, or rolled back on error);
+        otherwise a fresh connection is opened and closed as before.
+        """
         try:
             import psycopg
         except Exception as e:
             raise RuntimeError(
                 "DATABASE_URL is set but psycopg is not installed. Add psycopg[binary] to requirements.txt."
             ) from e
+        pool = self._get_pool()
+        if pool is not None:
+            return pool.connection()
         return psycopg.connect(self.database_url)
 
     def init(self) -> None:
@@ -462,6 +782,7 @@ class PostgresStorage(Storage):
                     (user_id, name, relationship, note.strip() if note else None),
                 )
             conn.commit()
+        self._bump_revision(user_id)
 
     def list_people(self, user_id: str) -> List[Dict[str, Any]]:
         with self._connect() as conn:
@@ -491,26 +812,20 @@ class PostgresStorage(Storage):
 
         with self._connect() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO ratings(user_id, poem_name, version_label, request_json, poem_text, rating, ending_pref, feedback)
-                    VALUES(%s,%s,%s,%s,%s,%s,%s,%s)
-                    RETURNING id
-                    """,
-                    (
-                        user_id,
-                        poem_name.strip() or "Untitled",
-                        version_label,
-                        json.dumps(request, ensure_ascii=False),
-                        poem_text,
-                        rating,
-                        ending_pref,
-                        feedback.strip() if feedback else None,
-                    ),
+                new_id = _pg_insert_rating(
+                    cur,
+                    user_id,
+                    poem_name,
+                    version_label,
+                    request,
+                    poem_text,
+                    rating,
+                    ending_pref,
+                    feedback,
                 )
-                new_id = cur.fetchone()[0]
             conn.commit()
-        return int(new_id)
+        self._bump_revision(user_id)
+        return new_id
 
     def list_ratings(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         limit = int(limit)
@@ -563,136 +878,105 @@ class PostgresStorage(Storage):
         rating: int,
         ending_pref: Optional[str],
     ) -> None:
-        rhyme = bool(request.get("rhyme", False))
-        line_count = int(request.get("line_count", 12))
-        reading_level = (request.get("reading_level") or "general").lower()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                _pg_apply_taste(cur, user_id, request, rating, ending_pref)
+            conn.commit()
+        self._bump_revision(user_id)
 
-        strength = rating - 3
-        rhyme_delta = float(strength if rhyme else -strength)
-        ending = (ending_pref or "").lower().strip()
+    def record_rating(
+        self,
+        user_id: str,
+        poem_name: str,
+        version_label: str,
+        request: Dict[str, Any],
+        poem_text: str,
+        rating: int,
+        ending_pref: Optional[str],
+        feedback: Optional[str],
+    ) -> int:
+        rating = int(rating)
+        if rating < 1 or rating > 5:
+            raise ValueError("Rating must be 1..5")
 
+        # One pooled connection, one cursor, one commit for both writes.
         with self._connect() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO taste_profile(user_id, total_ratings) VALUES(%s,0) ON CONFLICT (user_id) DO NOTHING",
-                    (user_id,),
-                )
-                cur.execute(
-                    """
-                    SELECT total_ratings, prefer_rhyme_score, avg_line_count,
-                           reading_simple_count, reading_general_count, reading_advanced_count,
-                           ending_soft_count, ending_twist_count, ending_punchline_count, ending_hopeful_count
-                    FROM taste_profile WHERE user_id=%s
-                    """,
-                    (user_id,),
-                )
-                row = cur.fetchone()
-                (
-                    total,
-                    prefer_rhyme_score,
-                    avg_line_count,
-                    rs,
-                    rg,
-                    ra,
-                    es,
-                    et,
-                    ep,
-                    eh,
-                ) = row
-
-                total = int(total)
-                new_total = total + 1
-                new_avg = (float(avg_line_count) * total + line_count) / new_total
-                new_rhyme_score = float(prefer_rhyme_score) + rhyme_delta
-
-                if reading_level == "simple":
-                    rs += 1
-                elif reading_level == "advanced":
-                    ra += 1
-                else:
-                    rg += 1
-
-                if ending == "soft":
-                    es += 1
-                elif ending == "twist":
-                    et += 1
-                elif ending == "punchline":
-                    ep += 1
-                elif ending == "hopeful":
-                    eh += 1
-
-                cur.execute(
-                    """
-                    UPDATE taste_profile SET
-                        total_ratings=%s,
-                        prefer_rhyme_score=%s,
-                        avg_line_count=%s,
-                        reading_simple_count=%s,
-                        reading_general_count=%s,
-                        reading_advanced_count=%s,
-                        ending_soft_count=%s,
-                        ending_twist_count=%s,
-                        ending_punchline_count=%s,
-                        ending_hopeful_count=%s,
-                        updated_at=now()
-                    WHERE user_id=%s
-                    """,
-                    (
-                        new_total,
-                        new_rhyme_score,
-                        new_avg,
-                        rs,
-                        rg,
-                        ra,
-                        es,
-                        et,
-                        ep,
-                        eh,
-                        user_id,
-                    ),
+                new_id = _pg_insert_rating(
+                    cur,
+                    user_id,
+                    poem_name,
+                    version_label,
+                    request,
+                    poem_text,
+                    rating,
+                    ending_pref,
+                    feedback,
                 )
+                _pg_apply_taste(cur, user_id, request, rating, ending_pref)
             conn.commit()
+        self._bump_revision(user_id)
+        return new_id
 
     def get_taste_profile(self, user_id: str) -> Dict[str, Any]:
         with self._connect() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM taste_profile WHERE user_id=%s", (user_id,))
                 row = cur.fetchone()
-                if not row:
-                    return {
-                        "total_ratings": 0,
-                        "prefer_rhyme_score": 0.0,
-                        "avg_line_count": None,
-                        "reading_level_guess": None,
-                        "ending_guess": None,
-                    }
-                cols = [desc[0] for desc in cur.description]
-                data = dict(zip(cols, row))
-
-        total = int(data["total_ratings"])
-        reading_counts = {
-            "simple": int(data["reading_simple_count"]),
-            "general": int(data["reading_general_count"]),
-            "advanced": int(data["reading_advanced_count"]),
-        }
-        reading_guess = (
-            max(reading_counts, key=reading_counts.get) if total > 0 else None
-        )
-
-        ending_counts = {
-            "soft": int(data["ending_soft_count"]),
-            "twist": int(data["ending_twist_count"]),
-            "punchline": int(data["ending_punchline_count"]),
-            "hopeful": int(data["ending_hopeful_count"]),
-        }
-        ending_guess = max(ending_counts, key=ending_counts.get) if total > 0 else None
+                data = None
+                if row:
+                    cols = [desc[0] for desc in cur.description]
+                    data = dict(zip(cols, row))
+        return _taste_from_row(data)
+
+    def get_user_bundle(self, user_id: str, ratings_limit: int = 10) -> Dict[str, Any]:
+        # One statement: each part is aggregated to JSON server-side, so the
+        # three reads cost a single network round-trip. json_build_object keeps
+        # the column order of the separate queries (jsonb would sort the keys).
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        (SELECT to_jsonb(t) FROM taste_profile t WHERE t.user_id=%s),
+                        (
+                            SELECT coalesce(json_agg(json_build_object(
+                                'id', p.id,
+                                'name', p.name,
+                                'relationship', p.relationship,
+                                'note', p.note,
+                                'created_at', p.created_at
+                            ) ORDER BY p.id DESC), '[]'::json)
+                            FROM people p WHERE p.user_id=%s
+                        ),
+                        (
+                            SELECT coalesce(json_agg(json_build_object(
+                                'created_at', r.created_at,
+                                'poem_name', r.poem_name,
+                                'version_label', r.version_label,
+                                'rating', r.rating,
+                                'ending_pref', r.ending_pref,
+                                'feedback', r.feedback
+                            ) ORDER BY r.id DESC), '[]'::json)
+                            FROM (
+                                SELECT id, created_at, poem_name, version_label, rating, ending_pref, feedback
+                                FROM ratings WHERE user_id=%s
+                                ORDER BY id DESC
+                                LIMIT %s
+                            ) r
+                        )
+                    """,
+                    (user_id, user_id, user_id, int(ratings_limit)),
+                )
+                taste, people, ratings = cur.fetchone()
 
+        # JSON carries timestamps as ISO strings; restore the datetimes the
+        # separate list_people / list_ratings queries return.
+        for row in (*people, *ratings):
+            if isinstance(row.get("created_at"), str):
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
         return {
-            "total_ratings": total,
-            "prefer_rhyme_score": float(data["prefer_rhyme_score"]),
-            "avg_line_count": float(data["avg_line_count"]),
-            "reading_level_guess": reading_guess,
-            "ending_guess": ending_guess,
-            "reading_counts": reading_counts,
-            "ending_counts": ending_counts,
+            "taste": _taste_from_row(taste),
+            "people": people,
+            "recent_ratings": ratings,
         }